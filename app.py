@@ -4,10 +4,21 @@
 
 import streamlit as st
 import time
+import threading
+import bisect
+import collections
+import itertools
+import operator
 import requests
-import pandas as pd
+import orjson
+import numpy as np
 from datetime import datetime
+from types import MappingProxyType
 import plotly.graph_objects as go
+import plotly.io as pio
+
+# st.plotly_chart serializes through plotly.io.to_json; require the C encoder, no silent fallback
+pio.json.config.default_engine = "orjson"
 
 # -------------------------------
 # PAGE CONFIG
@@ -24,6 +35,33 @@ st.set_page_config(
 ESP32_IP = "http://192.168.103.233"
 DATA_URL = f"{ESP32_IP}/data"
 
+REFRESH_OPTIONS = (0.5, 1, 2, 5, 10)  # seconds
+REFRESH_INDEX = {seconds: i for i, seconds in enumerate(REFRESH_OPTIONS)}
+
+POLL_QUEUE_SIZE = 200
+POLLER_IDLE_TIMEOUT = 30  # seconds a session may go without draining before the poller drops it
+POLL_BACKOFF_STEPS = 3  # identical readings double the poll wait, up to 2**3 times the interval
+POLL_BACKOFF_MAX = 10  # seconds, never back off past this (or the interval, if longer)
+POLL_STALE_SLACK = 5  # seconds past the back-off ceiling before the ESP32 counts as unreachable
+FIRST_SAMPLE_WAIT = 1  # seconds a new live session waits for the poller's first sample
+
+HISTORY_SIZE = 100
+HISTORY_COLUMNS = ["PTU300", "PTU8011", "Temperature", "Pressure", "Flow", "pH"]
+HISTORY_INDEX = {name: i for i, name in enumerate(HISTORY_COLUMNS)}
+# Gauge fill percent per unit of reading, same order as HISTORY_COLUMNS
+GAUGE_SCALES = np.array([10.0, 10.0, 100 / 50, 100 / 5, 100 / 20, 100 / 14])
+
+CHART_MAX_POINTS = 500  # longer histories are LTTB-downsampled before plotting
+
+# Trend chart traces: (history column, legend name, line color)
+TREND_TRACES = [
+    ("PTU300", "PTU-300", "#3b82f6"),
+    ("PTU8011", "PTU-8011", "#10b981"),
+    ("Temperature", "Temp", "#f59e0b"),
+    ("Flow", "Flow", "#8b5cf6"),
+    ("pH", "pH", "#ec4899"),
+]
+
 # -------------------------------
 # SESSION STATE INITIALIZATION
 # -------------------------------
@@ -33,170 +71,309 @@ if "auto_refresh" not in st.session_state:
     st.session_state.auto_refresh = True
 if "dark_mode" not in st.session_state:
     st.session_state.dark_mode = True
-if "history" not in st.session_state:
-    st.session_state.history = pd.DataFrame(columns=["time", "PTU300", "PTU8011", "Temperature", "Pressure", "Flow", "pH"])
+if "buf" not in st.session_state:
+    # Fixed-size ring buffer, one contiguous row per sensor in HISTORY_COLUMNS order.
+    # float32 is ample for sensor display precision and halves the buffer size.
+    st.session_state.buf = np.empty((len(HISTORY_COLUMNS), HISTORY_SIZE), dtype=np.float32)
+    st.session_state.times = np.empty(HISTORY_SIZE, dtype=np.float64)  # epoch seconds
+    st.session_state.head = 0
+    st.session_state.count = 0
+if "poll_token" not in st.session_state:
+    st.session_state.poll_token = object()  # identifies this session to the shared poller
 
 # -------------------------------
 # HELPER FUNCTIONS
 # -------------------------------
+# Shared status dicts, returned as-is by the lookups below (do not mutate)
+TURBIDITY_CLEAR = {"status": "Jernih", "color": "#10b981", "icon": "✅", "class": "status-clear"}
+TURBIDITY_TURBID = {"status": "Keruh", "color": "#f59e0b", "icon": "⚡", "class": "status-turbid"}
+TURBIDITY_DANGER = {"status": "Sangat Keruh", "color": "#ef4444", "icon": "⚠️", "class": "status-danger"}
+TURBIDITY_LEVELS = (TURBIDITY_CLEAR, TURBIDITY_TURBID, TURBIDITY_DANGER)
+TURBIDITY_EDGES = (2.0, 5.0)  # NTU where the next level starts
+
+FLOW_NONE = {"status": "No Flow", "class": "status-danger", "icon": "⛔", "color": "#ef4444"}
+FLOW_LOW = {"status": "Low", "class": "status-turbid", "icon": "⚠️", "color": "#f59e0b"}
+FLOW_NORMAL = {"status": "Normal", "class": "status-clear", "icon": "✅", "color": "#10b981"}
+FLOW_HIGH = {"status": "High", "class": "status-turbid", "icon": "⚡", "color": "#f59e0b"}
+
 def get_turbidity_status(value):
-    """Determine water status based on turbidity value"""
-    try:
-        v = float(value)
-    except Exception:
-        v = 0.0
-    if v < 2:
-        return {
-            "status": "Jernih",
-            "color": "#10b981",
-            "icon": "✅",
-            "class": "status-clear"
-        }
-    elif v < 5:
-        return {
-            "status": "Keruh",
-            "color": "#f59e0b",
-            "icon": "⚡",
-            "class": "status-turbid"
-        }
-    else:
-        return {
-            "status": "Sangat Keruh",
-            "color": "#ef4444",
-            "icon": "⚠️",
-            "class": "status-danger"
-        }
+    """Determine water status based on turbidity value (readings are always floats)"""
+    return TURBIDITY_LEVELS[bisect.bisect_right(TURBIDITY_EDGES, value)]
+
+def get_flow_status(value):
+    """Determine flow status based on flow rate in L/min"""
+    if value <= 0:
+        return FLOW_NONE
+    elif value < 1:
+        return FLOW_LOW
+    elif value <= 15:
+        return FLOW_NORMAL
+    return FLOW_HIGH
+
+# Status bands as (color, status, css class) for normal / warning / danger
+SENSOR_BANDS = (
+    ("#10b981", "Normal", "status-clear"),
+    ("#f59e0b", "Warning", "status-turbid"),
+    ("#ef4444", "Danger", "status-danger"),
+)
+TEMP_BANDS = (("#3b82f6", "Normal", "status-clear"),) + SENSOR_BANDS[1:]
+
+def band(value, lo, hi, warn_lo, warn_hi):
+    """0 inside the normal range, 1 inside the warning range, 2 otherwise"""
+    if lo <= value <= hi:
+        return 0
+    if warn_lo <= value <= warn_hi:
+        return 1
+    return 2
+
+def history_window(array):
+    """Ring buffer samples (last axis) ordered from oldest to newest"""
+    count = st.session_state.count
+    start = (st.session_state.head - count) % HISTORY_SIZE
+    if start + count <= HISTORY_SIZE:
+        return array[..., start:start + count]
+    # Wrapped: two contiguous slices instead of a per-sample index gather
+    return np.concatenate((array[..., start:], array[..., :start + count - HISTORY_SIZE]), axis=-1)
+
+def lttb_indices(x, y, n_out):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps to draw (x, y) with n_out points"""
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    # First and last points are always kept, the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    keep = np.empty(n_out, dtype=int)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[n - 1], y[n - 1]
+        # Real x values: samples are unevenly spaced once the poller backs off
+        xs, ys = x[start:end], y[start:end]
+        area = np.abs((x[a] - next_x) * (ys - y[a]) - (x[a] - xs) * (next_y - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+def live_refresh_interval():
+    """run_every value for the live fragments, None while auto-refresh is off"""
+    return st.session_state.refresh_sec if st.session_state.auto_refresh else None
+
+def to_local_epoch_ms(epoch_seconds):
+    """Epoch seconds to local-time milliseconds for a Plotly date axis"""
+    # Plain float64 serializes as a base64 typed array, datetime64 would go out as ISO strings
+    offset = datetime.now().astimezone().utcoffset().total_seconds()
+    return (epoch_seconds + offset) * 1000.0
+
+def append_history(samples):
+    """Write a batch of (timestamp, reading) samples into the ring buffer in one assignment"""
+    samples = samples[-HISTORY_SIZE:]
+    n = len(samples)
+    rows = np.asarray([reading for _, reading in samples], dtype=np.float32)
+    idx = (st.session_state.head + np.arange(n)) % HISTORY_SIZE
+    st.session_state.buf[:, idx] = rows.T
+    st.session_state.times[idx] = [ts for ts, _ in samples]
+    st.session_state.head = (st.session_state.head + n) % HISTORY_SIZE
+    st.session_state.count = min(st.session_state.count + n, HISTORY_SIZE)
 
 # -------------------------------
 # DYNAMIC STYLING BASED ON THEME
 # -------------------------------
-def get_theme_colors():
-    """Get colors based on current theme"""
-    if st.session_state.dark_mode:
-        return {
-            "bg_primary": "#0a0e27",
-            "bg_secondary": "#1a1f3a",
-            "bg_card": "linear-gradient(135deg, #1a1f3a, #2d3561)",
-            "text_primary": "#ffffff",
-            "text_secondary": "#a8b2d1",
-            "border": "#2d3561",
-            "shadow": "0 8px 32px rgba(0, 0, 0, 0.4)",
-            "gauge_bg": "#2d3561",
-            "liquid_tank": "#3b82f6",
-            "liquid_fill": "#1e40af",
-            "chart_bg": "#1a1f3a",
-            "chart_grid": "#2d3561",
-            "chart_text": "#a8b2d1",
-        }
-    else:
-        return {
-            "bg_primary": "#f0f4f8",
-            "bg_secondary": "#ffffff",
-            "bg_card": "linear-gradient(135deg, #ffffff, #f8fafc)",
-            "text_primary": "#1e293b",
-            "text_secondary": "#64748b",
-            "border": "#e2e8f0",
-            "shadow": "0 8px 32px rgba(0, 0, 0, 0.08)",
-            "gauge_bg": "#e2e8f0",
-            "liquid_tank": "#60a5fa",
-            "liquid_fill": "#3b82f6",
-            "chart_bg": "#ffffff",
-            "chart_grid": "#e2e8f0",
-            "chart_text": "#64748b",
-        }
-
-colors = get_theme_colors()
+# Read-only colour sets per theme, indexed by dark_mode
+DARK_COLORS = MappingProxyType({
+    "bg_primary": "#0a0e27",
+    "bg_secondary": "#1a1f3a",
+    "bg_card": "linear-gradient(135deg, #1a1f3a, #2d3561)",
+    "text_primary": "#ffffff",
+    "text_secondary": "#a8b2d1",
+    "border": "#2d3561",
+    "shadow": "0 8px 32px rgba(0, 0, 0, 0.4)",
+    "gauge_bg": "#2d3561",
+    "liquid_tank": "#3b82f6",
+    "liquid_fill": "#1e40af",
+    "chart_bg": "#1a1f3a",
+    "chart_grid": "#2d3561",
+    "chart_text": "#a8b2d1",
+})
+
+LIGHT_COLORS = MappingProxyType({
+    "bg_primary": "#f0f4f8",
+    "bg_secondary": "#ffffff",
+    "bg_card": "linear-gradient(135deg, #ffffff, #f8fafc)",
+    "text_primary": "#1e293b",
+    "text_secondary": "#64748b",
+    "border": "#e2e8f0",
+    "shadow": "0 8px 32px rgba(0, 0, 0, 0.08)",
+    "gauge_bg": "#e2e8f0",
+    "liquid_tank": "#60a5fa",
+    "liquid_fill": "#3b82f6",
+    "chart_bg": "#ffffff",
+    "chart_grid": "#e2e8f0",
+    "chart_text": "#64748b",
+})
+
+THEME_COLORS = (LIGHT_COLORS, DARK_COLORS)
+
+@st.cache_resource(show_spinner=False)
+def get_trend_layout() -> go.Layout:
+    """Static trend chart layout, validated once per process (shared instance, do not mutate)"""
+    return go.Layout(
+        template='none',  # the default template adds ~6 KB to every tick, the colours below are all explicit
+        height=300,
+        font=dict(size=10),
+        xaxis=dict(
+            type='date',
+            tickformat='%H:%M:%S',
+            hoverformat='%H:%M:%S',
+            showgrid=True,
+            gridwidth=1,
+            zeroline=False
+        ),
+        yaxis=dict(
+            showgrid=True,
+            gridwidth=1,
+            zeroline=False
+        ),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5,
+            bgcolor='rgba(0,0,0,0)',
+            font=dict(size=9)
+        ),
+        margin=dict(l=35, r=15, t=35, b=35),
+        hovermode='x unified',
+        uirevision="keep"  # keep zoom/pan and legend toggles across data updates
+    )
+
+def build_trend_figure():
+    """Create the trend chart with empty traces on top of the shared layout"""
+    # go.Figure copies the layout, so theming the figure leaves the cached one intact
+    return go.Figure(
+        data=[
+            go.Scattergl(
+                x=[],
+                y=[],
+                mode='lines+markers',
+                name=name,
+                line=dict(color=color, width=2),
+                marker=dict(size=3)
+            )
+            for _, name, color in TREND_TRACES
+        ],
+        layout=get_trend_layout()
+    )
+
+def apply_trend_theme(fig, colors):
+    """Recolor the trend chart in place, traces and data are left alone"""
+    axis = dict(gridcolor=colors['chart_grid'], color=colors['chart_text'])
+    fig.update_layout(
+        plot_bgcolor=colors['chart_bg'],
+        paper_bgcolor=colors['chart_bg'],
+        font_color=colors['chart_text'],
+        legend_font_color=colors['chart_text'],
+        xaxis=axis,
+        yaxis=axis
+    )
+
+colors = THEME_COLORS[st.session_state.dark_mode]
 
 # -------------------------------
 # APPLY CUSTOM CSS WITH MOBILE RESPONSIVE
 # -------------------------------
-st.markdown(f"""
+PAGE_CSS = """
 <style>
 @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
 
-* {{
+* {
     font-family: 'Inter', sans-serif;
     margin: 0;
     padding: 0;
     box-sizing: border-box;
-}}
+}
 
-.stApp {{
-    background-color: {colors['bg_primary']} !important;
-}}
+.stApp {
+    background-color: var(--bg-primary) !important;
+}
 
 /* HIDE STREAMLIT BRANDING & WHITE ELEMENTS */
-#MainMenu {{visibility: hidden !important;}}
-footer {{visibility: hidden !important;}}
-.stDeployButton {{display: none !important;}}
-header {{visibility: hidden !important;}}
-.stAppHeader {{display: none !important;}}
-.stAppToolbar {{display: none !important;}}
-
-.stApp > header {{
+#MainMenu {visibility: hidden !important;}
+footer {visibility: hidden !important;}
+.stDeployButton {display: none !important;}
+header {visibility: hidden !important;}
+.stAppHeader {display: none !important;}
+.stAppToolbar {display: none !important;}
+
+.stApp > header {
     background-color: transparent !important;
-}}
+}
 
 /* Sidebar Styling */
-[data-testid="stSidebar"] {{
-    background-color: {colors['bg_secondary']};
-    border-right: 2px solid {colors['border']};
-}}
+[data-testid="stSidebar"] {
+    background-color: var(--bg-secondary);
+    border-right: 2px solid var(--border);
+}
 
-[data-testid="stSidebar"] [data-testid="stMarkdownContainer"] {{
-    color: {colors['text_primary']};
-}}
+[data-testid="stSidebar"] [data-testid="stMarkdownContainer"] {
+    color: var(--text-primary);
+}
 
 /* Top Navigation Bar - RESPONSIVE */
-.top-nav {{
-    background: {colors['bg_card']};
+.top-nav {
+    background: var(--bg-card);
     padding: 1rem 1.5rem;
     border-radius: 15px;
     margin-bottom: 1rem;
-    box-shadow: {colors['shadow']};
-    border: 1px solid {colors['border']};
+    box-shadow: var(--shadow);
+    border: 1px solid var(--border);
     display: flex;
     justify-content: space-between;
     align-items: center;
     flex-wrap: wrap;
     gap: 1rem;
-}}
+}
 
-.nav-brand {{
+.nav-brand {
     display: flex;
     align-items: center;
     gap: 0.75rem;
     flex: 1;
     min-width: 200px;
-}}
+}
 
-.nav-logo {{
+.nav-logo {
     font-size: 2rem;
     animation: float 3s ease-in-out infinite;
-}}
+}
 
-@keyframes float {{
-    0%, 100% {{ transform: translateY(0px); }}
-    50% {{ transform: translateY(-10px); }}
-}}
+@keyframes float {
+    0%, 100% { transform: translateY(0px); }
+    50% { transform: translateY(-10px); }
+}
 
-.nav-title {{
+.nav-title {
     font-size: 1.3rem;
     font-weight: 700;
-    color: {colors['text_primary']};
+    color: var(--text-primary);
     background: linear-gradient(135deg, #3b82f6, #10b981);
     -webkit-background-clip: text;
     -webkit-text-fill-color: transparent;
     line-height: 1.2;
-}}
+}
 
-.nav-subtitle {{
+.nav-subtitle {
     font-size: 0.75rem;
-    color: {colors['text_secondary']};
+    color: var(--text-secondary);
     margin-top: 0.15rem;
-}}
+}
 
-.status-live {{
+.status-live {
     background: linear-gradient(135deg, #10b981, #059669);
     color: white;
     padding: 0.5rem 1rem;
@@ -208,56 +385,68 @@ header {{visibility: hidden !important;}}
     gap: 0.5rem;
     box-shadow: 0 4px 12px rgba(16, 185, 129, 0.3);
     white-space: nowrap;
-}}
+}
 
-.pulse-dot {{
+.pulse-dot {
     width: 8px;
     height: 8px;
     background: white;
     border-radius: 50%;
     animation: pulse 2s ease-in-out infinite;
-}}
+}
+
+@keyframes pulse {
+    0%, 100% { opacity: 1; transform: scale(1); }
+    50% { opacity: 0.5; transform: scale(1.2); }
+}
+
+/* Card Rows - RESPONSIVE GRID */
+.scada-row {
+    display: grid;
+    grid-template-columns: repeat(4, 1fr);
+    gap: 1rem;
+    margin-bottom: 1rem;
+}
 
-@keyframes pulse {{
-    0%, 100% {{ opacity: 1; transform: scale(1); }}
-    50% {{ opacity: 0.5; transform: scale(1.2); }}
-}}
+.scada-row-3 {
+    grid-template-columns: repeat(3, 1fr);
+}
 
 /* SCADA Cards - RESPONSIVE */
-.scada-card {{
-    background: {colors['bg_card']};
+.scada-card {
+    background: var(--bg-card);
     border-radius: 15px;
     padding: 1rem;
-    box-shadow: {colors['shadow']};
-    border: 1px solid {colors['border']};
+    box-shadow: var(--shadow);
+    border: 1px solid var(--border);
     text-align: center;
     transition: all 0.3s ease;
     height: 100%;
     min-height: 280px;
-}}
+}
 
-.scada-card:hover {{
+.scada-card:hover {
     transform: translateY(-3px);
     box-shadow: 0 12px 40px rgba(0, 0, 0, 0.3);
-}}
+}
 
-.card-title {{
+.card-title {
     font-size: 0.95rem;
     font-weight: 600;
-    color: {colors['text_primary']};
+    color: var(--text-primary);
     margin-bottom: 0.75rem;
     display: flex;
     align-items: center;
     justify-content: center;
     gap: 0.4rem;
-}}
+}
 
-.card-icon {{
+.card-icon {
     font-size: 1.2rem;
-}}
+}
 
 /* Status Badge */
-.status-badge {{
+.status-badge {
     display: inline-block;
     padding: 0.35rem 0.85rem;
     border-radius: 15px;
@@ -267,167 +456,167 @@ header {{visibility: hidden !important;}}
     text-transform: uppercase;
     letter-spacing: 0.3px;
     box-shadow: 0 4px 12px rgba(0, 0, 0, 0.12);
-}}
+}
 
-.status-clear {{
+.status-clear {
     background: linear-gradient(135deg, #10b981, #059669);
     color: white;
-}}
+}
 
-.status-turbid {{
+.status-turbid {
     background: linear-gradient(135deg, #f59e0b, #d97706);
     color: white;
-}}
+}
 
-.status-danger {{
+.status-danger {
     background: linear-gradient(135deg, #ef4444, #dc2626);
     color: white;
-}}
+}
 
 /* Tank Visualization - RESPONSIVE */
-.tank-container {{
+.tank-container {
     display: flex;
     flex-direction: column;
     align-items: center;
     justify-content: center;
     padding: 0.5rem;
-}}
+}
 
-.tank {{
+.tank {
     width: 100px;
     height: 140px;
-    background: {colors['liquid_tank']};
-    border: 4px solid {colors['liquid_fill']};
+    background: var(--liquid-tank);
+    border: 4px solid var(--liquid-fill);
     border-radius: 10px 10px 18px 18px;
     position: relative;
     overflow: hidden;
     box-shadow: inset 0 0 15px rgba(0, 0, 0, 0.15);
-}}
+}
 
-.liquid {{
+.liquid {
     position: absolute;
     bottom: 0;
     width: 100%;
-    background: linear-gradient(180deg, {colors['liquid_fill']}, #1e3a8a);
+    background: linear-gradient(180deg, var(--liquid-fill), #1e3a8a);
     transition: height 0.8s ease;
     animation: wave 3s ease-in-out infinite;
-}}
+}
 
-@keyframes wave {{
-    0%, 100% {{ transform: translateY(0px); }}
-    50% {{ transform: translateY(-5px); }}
-}}
+@keyframes wave {
+    0%, 100% { transform: translateY(0px); }
+    50% { transform: translateY(-5px); }
+}
 
-.tank-label {{
+.tank-label {
     margin-top: 0.6rem;
     font-weight: 700;
     font-size: 0.9rem;
-    color: {colors['text_primary']};
-}}
+    color: var(--text-primary);
+}
 
 /* Gauge Visualization - RESPONSIVE */
-.gauge-container {{
+.gauge-container {
     display: flex;
     flex-direction: column;
     align-items: center;
     gap: 0.75rem;
     padding: 0.5rem;
-}}
+}
 
-.gauge {{
+.gauge {
     width: 120px;
     height: 120px;
     border-radius: 50%;
     background: conic-gradient(
         #10b981 0deg,
         #3b82f6 calc(var(--value) * 3.6deg),
-        {colors['gauge_bg']} calc(var(--value) * 3.6deg)
+        var(--gauge-bg) calc(var(--value) * 3.6deg)
     );
     display: flex;
     align-items: center;
     justify-content: center;
     position: relative;
-    box-shadow: {colors['shadow']};
+    box-shadow: var(--shadow);
     transition: all 0.4s ease;
-}}
+}
 
-.gauge::after {{
+.gauge::after {
     content: "";
     position: absolute;
     width: 85px;
     height: 85px;
     border-radius: 50%;
-    background: {colors['bg_secondary']};
-}}
+    background: var(--bg-secondary);
+}
 
-.gauge-value {{
+.gauge-value {
     position: relative;
     z-index: 2;
     font-size: 1.1rem;
     font-weight: 700;
-    color: {colors['text_primary']};
-}}
+    color: var(--text-primary);
+}
 
-.gauge-label {{
+.gauge-label {
     font-size: 0.8rem;
-    color: {colors['text_secondary']};
+    color: var(--text-secondary);
     font-weight: 600;
-}}
+}
 
 /* Mini Gauge - RESPONSIVE */
-.mini-gauge {{
+.mini-gauge {
     width: 95px;
     height: 95px;
     border-radius: 50%;
     background: conic-gradient(
         var(--color) calc(var(--value) * 3.6deg),
-        {colors['gauge_bg']} calc(var(--value) * 3.6deg)
+        var(--gauge-bg) calc(var(--value) * 3.6deg)
     );
     display: flex;
     align-items: center;
     justify-content: center;
     position: relative;
-    box-shadow: {colors['shadow']};
-}}
+    box-shadow: var(--shadow);
+}
 
-.mini-gauge::after {{
+.mini-gauge::after {
     content: "";
     position: absolute;
     width: 65px;
     height: 65px;
     border-radius: 50%;
-    background: {colors['bg_secondary']};
-}}
+    background: var(--bg-secondary);
+}
 
-.mini-gauge-value {{
+.mini-gauge-value {
     position: relative;
     z-index: 2;
     font-size: 0.95rem;
     font-weight: 700;
-    color: {colors['text_primary']};
-}}
+    color: var(--text-primary);
+}
 
 /* Progress Bar - RESPONSIVE */
-.progress-container {{
+.progress-container {
     width: 100%;
     height: 20px;
-    background: {colors['gauge_bg']};
+    background: var(--gauge-bg);
     border-radius: 10px;
     overflow: hidden;
     margin-top: 0.5rem;
     box-shadow: inset 0 2px 4px rgba(0, 0, 0, 0.12);
-}}
+}
 
-.progress-fill {{
+.progress-fill {
     height: 100%;
     background: linear-gradient(90deg, #06b6d4, #3b82f6, #8b5cf6);
     transition: width 0.6s ease;
     border-radius: 10px;
     position: relative;
     overflow: hidden;
-}}
+}
 
-.progress-fill::after {{
+.progress-fill::after {
     content: "";
     position: absolute;
     top: 0;
@@ -436,399 +625,628 @@ header {{visibility: hidden !important;}}
     height: 100%;
     background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.25), transparent);
     animation: shimmer 2s infinite;
-}}
+}
 
-@keyframes shimmer {{
-    0% {{ transform: translateX(-100%); }}
-    100% {{ transform: translateX(100%); }}
-}}
+@keyframes shimmer {
+    0% { transform: translateX(-100%); }
+    100% { transform: translateX(100%); }
+}
 
 /* Chart Container - RESPONSIVE */
-.chart-container {{
-    background: {colors['bg_card']};
+.chart-container {
+    background: var(--bg-card);
     border-radius: 15px;
     padding: 1rem;
-    box-shadow: {colors['shadow']};
-    border: 1px solid {colors['border']};
+    box-shadow: var(--shadow);
+    border: 1px solid var(--border);
     margin-top: 1rem;
-}}
+}
 
-.chart-title {{
+.chart-title {
     font-size: 1rem;
     font-weight: 700;
-    color: {colors['text_primary']};
+    color: var(--text-primary);
     margin-bottom: 0.75rem;
     text-align: center;
-}}
+}
 
 /* Footer */
-.footer {{
+.footer {
     text-align: center;
     padding: 0.75rem;
     margin-top: 1.5rem;
-    background: {colors['bg_card']};
+    background: var(--bg-card);
     border-radius: 10px;
-    box-shadow: {colors['shadow']};
-    border: 1px solid {colors['border']};
-    color: {colors['text_secondary']};
+    box-shadow: var(--shadow);
+    border: 1px solid var(--border);
+    color: var(--text-secondary);
     font-size: 0.75rem;
-}}
+}
 
 /* Refresh Info */
-.refresh-info {{
+.refresh-info {
     text-align: center;
-    color: {colors['text_secondary']};
+    color: var(--text-secondary);
     font-size: 0.75rem;
     margin-top: 0.75rem;
     padding: 0.6rem;
-    background: {colors['bg_secondary']};
+    background: var(--bg-secondary);
     border-radius: 8px;
-    border: 1px solid {colors['border']};
-}}
+    border: 1px solid var(--border);
+}
 
 /* Value Display */
-.value-display {{
+.value-display {
     font-size: 0.75rem;
-    color: {colors['text_secondary']};
+    color: var(--text-secondary);
     margin-top: 0.3rem;
-}}
+}
 
 /* Streamlit specific fixes */
-.block-container {{
+.block-container {
     padding-top: 1rem !important;
     padding-bottom: 1rem !important;
     padding-left: 1rem !important;
     padding-right: 1rem !important;
-}}
+}
 
-.row-widget {{
+.row-widget {
     margin-bottom: 0.75rem !important;
-}}
+}
 
 /* ================================
    MOBILE RESPONSIVE BREAKPOINTS
    ================================ */
 
 /* Tablets and smaller (max-width: 768px) */
-@media (max-width: 768px) {{
-    .top-nav {{
+@media (max-width: 768px) {
+    .top-nav {
         padding: 0.75rem 1rem;
         border-radius: 12px;
         flex-direction: column;
         text-align: center;
-    }}
+    }
     
-    .nav-brand {{
+    .nav-brand {
         justify-content: center;
         min-width: unset;
-    }}
+    }
     
-    .nav-logo {{
+    .nav-logo {
         font-size: 1.75rem;
-    }}
+    }
     
-    .nav-title {{
+    .nav-title {
         font-size: 1.1rem;
-    }}
+    }
     
-    .nav-subtitle {{
+    .nav-subtitle {
         font-size: 0.7rem;
-    }}
+    }
     
-    .status-live {{
+    .status-live {
         padding: 0.4rem 0.85rem;
         font-size: 0.75rem;
-    }}
+    }
+    
+    .scada-row, .scada-row-3 {
+        grid-template-columns: repeat(2, 1fr);
+        gap: 0.75rem;
+        margin-bottom: 0.75rem;
+    }
     
-    .scada-card {{
+    .scada-card {
         padding: 0.85rem;
         border-radius: 12px;
         min-height: 240px;
-    }}
+    }
     
-    .card-title {{
+    .card-title {
         font-size: 0.85rem;
         margin-bottom: 0.5rem;
-    }}
+    }
     
-    .card-icon {{
+    .card-icon {
         font-size: 1rem;
-    }}
+    }
     
-    .tank {{
+    .tank {
         width: 85px;
         height: 120px;
-        border: 3px solid {colors['liquid_fill']};
-    }}
+        border: 3px solid var(--liquid-fill);
+    }
     
-    .tank-label {{
+    .tank-label {
         font-size: 0.8rem;
         margin-top: 0.5rem;
-    }}
+    }
     
-    .mini-gauge {{
+    .mini-gauge {
         width: 80px;
         height: 80px;
-    }}
+    }
     
-    .mini-gauge::after {{
+    .mini-gauge::after {
         width: 55px;
         height: 55px;
-    }}
+    }
     
-    .mini-gauge-value {{
+    .mini-gauge-value {
         font-size: 0.85rem;
-    }}
+    }
     
-    .gauge-label {{
+    .gauge-label {
         font-size: 0.75rem;
-    }}
+    }
     
-    .status-badge {{
+    .status-badge {
         font-size: 0.7rem;
         padding: 0.3rem 0.7rem;
         margin-top: 0.4rem;
-    }}
+    }
     
-    .value-display {{
+    .value-display {
         font-size: 0.7rem;
-    }}
+    }
     
-    .progress-container {{
+    .progress-container {
         height: 18px;
-    }}
+    }
     
-    .chart-container {{
+    .chart-container {
         padding: 0.85rem;
         border-radius: 12px;
-    }}
+    }
     
-    .chart-title {{
+    .chart-title {
         font-size: 0.9rem;
         margin-bottom: 0.5rem;
-    }}
+    }
     
-    .refresh-info {{
+    .refresh-info {
         font-size: 0.7rem;
         padding: 0.5rem;
-    }}
+    }
     
-    .footer {{
+    .footer {
         font-size: 0.7rem;
         padding: 0.6rem;
-    }}
+    }
     
-    .block-container {{
+    .block-container {
         padding-left: 0.75rem !important;
         padding-right: 0.75rem !important;
-    }}
-}}
+    }
+}
 
 /* Mobile phones (max-width: 480px) */
-@media (max-width: 480px) {{
-    .top-nav {{
+@media (max-width: 480px) {
+    .top-nav {
         padding: 0.6rem 0.75rem;
         border-radius: 10px;
         margin-bottom: 0.75rem;
-    }}
+    }
     
-    .nav-logo {{
+    .nav-logo {
         font-size: 1.5rem;
-    }}
+    }
     
-    .nav-title {{
+    .nav-title {
         font-size: 0.95rem;
-    }}
+    }
     
-    .nav-subtitle {{
+    .nav-subtitle {
         font-size: 0.65rem;
-    }}
+    }
     
-    .status-live {{
+    .status-live {
         padding: 0.35rem 0.7rem;
         font-size: 0.7rem;
-    }}
+    }
     
-    .pulse-dot {{
+    .pulse-dot {
         width: 6px;
         height: 6px;
-    }}
+    }
     
-    .scada-card {{
+    .scada-row, .scada-row-3 {
+        grid-template-columns: 1fr;
+    }
+    
+    .scada-card {
         padding: 0.75rem;
         border-radius: 10px;
         min-height: 220px;
-    }}
+    }
     
-    .card-title {{
+    .card-title {
         font-size: 0.8rem;
         margin-bottom: 0.4rem;
         gap: 0.3rem;
-    }}
+    }
     
-    .card-icon {{
+    .card-icon {
         font-size: 0.9rem;
-    }}
+    }
     
-    .tank {{
+    .tank {
         width: 70px;
         height: 100px;
-        border: 3px solid {colors['liquid_fill']};
+        border: 3px solid var(--liquid-fill);
         border-radius: 8px 8px 15px 15px;
-    }}
+    }
     
-    .tank-label {{
+    .tank-label {
         font-size: 0.75rem;
         margin-top: 0.4rem;
-    }}
+    }
     
-    .mini-gauge {{
+    .mini-gauge {
         width: 70px;
         height: 70px;
-    }}
+    }
     
-    .mini-gauge::after {{
+    .mini-gauge::after {
         width: 48px;
         height: 48px;
-    }}
+    }
     
-    .mini-gauge-value {{
+    .mini-gauge-value {
         font-size: 0.75rem;
-    }}
+    }
     
-    .gauge-label {{
+    .gauge-label {
         font-size: 0.7rem;
         margin-top: 0.3rem;
-    }}
+    }
     
-    .status-badge {{
+    .status-badge {
         font-size: 0.65rem;
         padding: 0.25rem 0.6rem;
         margin-top: 0.35rem;
         border-radius: 12px;
-    }}
+    }
     
-    .value-display {{
+    .value-display {
         font-size: 0.65rem;
         margin-top: 0.25rem;
-    }}
+    }
     
-    .progress-container {{
+    .progress-container {
         height: 16px;
         margin-top: 0.4rem;
-    }}
+    }
     
-    .chart-container {{
+    .chart-container {
         padding: 0.75rem;
         border-radius: 10px;
         margin-top: 0.75rem;
-    }}
+    }
     
-    .chart-title {{
+    .chart-title {
         font-size: 0.85rem;
         margin-bottom: 0.4rem;
-    }}
+    }
     
-    .refresh-info {{
+    .refresh-info {
         font-size: 0.65rem;
         padding: 0.45rem;
         margin-top: 0.5rem;
         border-radius: 6px;
-    }}
+    }
     
-    .footer {{
+    .footer {
         font-size: 0.65rem;
         padding: 0.5rem;
         margin-top: 1rem;
         border-radius: 8px;
-    }}
+    }
     
-    .block-container {{
+    .block-container {
         padding-left: 0.5rem !important;
         padding-right: 0.5rem !important;
         padding-top: 0.75rem !important;
         padding-bottom: 0.75rem !important;
-    }}
-}}
+    }
+}
 
 /* Extra small devices (max-width: 360px) */
-@media (max-width: 360px) {{
-    .nav-title {{
+@media (max-width: 360px) {
+    .nav-title {
         font-size: 0.85rem;
-    }}
+    }
     
-    .nav-subtitle {{
+    .nav-subtitle {
         font-size: 0.6rem;
-    }}
+    }
     
-    .card-title {{
+    .card-title {
         font-size: 0.75rem;
-    }}
+    }
     
-    .mini-gauge {{
+    .mini-gauge {
         width: 65px;
         height: 65px;
-    }}
+    }
     
-    .mini-gauge::after {{
+    .mini-gauge::after {
         width: 45px;
         height: 45px;
-    }}
+    }
     
-    .mini-gauge-value {{
+    .mini-gauge-value {
         font-size: 0.7rem;
-    }}
+    }
     
-    .tank {{
+    .tank {
         width: 60px;
         height: 90px;
-    }}
-}}
+    }
+}
 
 /* Landscape mode adjustments for mobile */
-@media (max-height: 500px) and (orientation: landscape) {{
-    .scada-card {{
+@media (max-height: 500px) and (orientation: landscape) {
+    .scada-card {
         min-height: 180px;
-    }}
+    }
     
-    .mini-gauge {{
+    .mini-gauge {
         width: 65px;
         height: 65px;
-    }}
+    }
     
-    .mini-gauge::after {{
+    .mini-gauge::after {
         width: 45px;
         height: 45px;
-    }}
+    }
     
-    .tank {{
+    .tank {
         width: 60px;
         height: 85px;
-    }}
-}}
+    }
+}
 </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_data(show_spinner=False)
+def render_css(dark_mode: bool) -> str:
+    """Theme colours as CSS variables ahead of the static stylesheet, once per theme"""
+    variables = "".join(
+        f"--{name.replace('_', '-')}: {value}; " for name, value in THEME_COLORS[dark_mode].items()
+    )
+    return f"<style>:root {{ {variables}}}</style>\n{PAGE_CSS}"
+
+st.markdown(render_css(st.session_state.dark_mode), unsafe_allow_html=True)
+
+# -------------------------------
+# CARD TEMPLATES
+# -------------------------------
+TANK_CARD = """
+<div class="scada-card">
+    <div class="card-title">
+        <span class="card-icon">💧</span>
+        Input Tank
+    </div>
+    <div class="tank-container">
+        <div class="tank">
+            <div class="liquid" style="height:{level}%"></div>
+        </div>
+        <div class="tank-label">{level:.1f}%</div>
+        <div class="value-display">Water Level</div>
+    </div>
+</div>
+"""
+
+TURBIDITY_CARD = """
+<div class="scada-card">
+    <div class="card-title">
+        <span class="card-icon">🧪</span>
+        {title}
+    </div>
+    <div class="gauge-container">
+        <div>
+            <div class="mini-gauge" style="--value:{percent}; --color:{color};">
+                <div class="mini-gauge-value">{value:.2f}</div>
+            </div>
+            <div class="gauge-label" style="margin-top:0.4rem;">NTU</div>
+            <div class="status-badge {css_class}">
+                {icon} {status}
+            </div>
+        </div>
+    </div>
+</div>
+"""
+
+FLOW_CARD = """
+<div class="scada-card">
+    <div class="card-title">
+        <span class="card-icon">💨</span>
+        Flow Meter
+    </div>
+    <div class="gauge-container">
+        <div class="mini-gauge" style="--value:{percent}; --color:{color};">
+            <div class="mini-gauge-value">{value:.2f}</div>
+        </div>
+        <div class="gauge-label" style="margin-top:0.4rem;">L/min</div>
+        <div class="progress-container" style="margin-top:0.5rem;">
+            <div class="progress-fill" style="width:{percent}%;"></div>
+        </div>
+        <div class="status-badge {css_class}" style="margin-top:0.5rem;">
+            {icon} {status}
+        </div>
+        <div class="value-display" style="margin-top:0.3rem;">
+            {percent:.1f}%
+        </div>
+    </div>
+</div>
+"""
+
+SENSOR_CARD = """
+<div class="scada-card">
+    <div class="card-title">
+        <span class="card-icon">{icon}</span>
+        {title}
+    </div>
+    <div class="gauge-container">
+        <div class="mini-gauge" style="--value:{percent}; --color:{color};">
+            <div class="mini-gauge-value">{value:.{digits}f}</div>
+        </div>
+        <div class="gauge-label" style="margin-top:0.4rem;">{unit}</div>
+        <div class="status-badge {css_class}">
+            {status}
+        </div>
+        <div class="value-display">{normal_range}</div>
+    </div>
+</div>
+"""
+
+REFRESH_INFO = """
+<div class="refresh-info">
+    🔄 Auto-refresh: {state} | ⏱️ {interval}s | 🕐 {clock}
+</div>
+"""
 
 # -------------------------------
 # DATA FETCHING FUNCTION
 # -------------------------------
-def read_esp32_data(url: str):
-    """Fetch data from ESP32"""
+# ESP32 JSON field for each reading, in HISTORY_COLUMNS order.
+# A reading is a plain tuple in this order, ready to write into the history.
+ESP32_FIELDS = {
+    "ptu300": "PTU300_ID7_NTU",
+    "ptu8011": "PTU8011_ID8_NTU",
+    "temperature": "Temperature_C",
+    "pressure": "Pressure_Bar",
+    "flow": "Flow_Lmin",
+    "ph": "pH_Value",
+}
+DEFAULT_READING = (0.0, 0.0, 25.0, 1.0, 0.0, 7.0)  # fills fields missing from a payload only
+get_esp32_fields = operator.itemgetter(*ESP32_FIELDS.values())
+
+def make_http_session():
+    """Keep-alive HTTP session so each poll reuses the ESP32 connection"""
+    session = requests.Session()
+    session.headers.update({"Connection": "keep-alive"})
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1)
+    session.mount("http://", adapter)
+    return session
+
+def to_float(value, default: float) -> float:
+    """float(value), or the default when the ESP32 sent something non-numeric"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+def read_esp32_data(session: requests.Session, url: str):
+    """Fetch one reading from the ESP32, None when it cannot be reached"""
     try:
-        r = requests.get(url, timeout=3)
+        r = session.get(url, timeout=(1.0, 2.0))
         if r.status_code == 200:
-            data = r.json()
-            return {
-                "ptu300": float(data.get("PTU300_ID7_NTU", 0.0)),
-                "ptu8011": float(data.get("PTU8011_ID8_NTU", 0.0)),
-                "flow": float(data.get("Flow_Lmin", 0.0)),
-                "ph": float(data.get("pH_Value", 7.0)),
-                "temperature": float(data.get("Temperature_C", 25.0)),
-                "pressure": float(data.get("Pressure_Bar", 1.0)),
-            }
+            data = orjson.loads(r.content)
+            try:
+                values = get_esp32_fields(data)
+            except KeyError:
+                # Partial payload: fill missing fields from the defaults
+                values = [data.get(field, default) for field, default in zip(ESP32_FIELDS.values(), DEFAULT_READING)]
+            return tuple(map(to_float, values, DEFAULT_READING))
     except Exception:
         pass
-    return {"ptu300": 0.0, "ptu8011": 0.0, "flow": 0.0, "ph": 7.0, "temperature": 25.0, "pressure": 1.0}
+    return None
+
+# -------------------------------
+# BACKGROUND POLLER
+# -------------------------------
+class ESP32Poller:
+    """Polls the ESP32 on its own thread; one instance feeds every session"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.samples = collections.deque(maxlen=POLL_QUEUE_SIZE)
+        self.seq = 0  # sequence number of the newest sample in self.samples
+        self.readers = {}  # session token -> (refresh interval, last drain time, last sample time handed out)
+        self.lock = threading.Lock()
+        self.fresh = threading.Condition(self.lock)  # notified whenever a sample is appended
+        self.wake = threading.Event()
+        self.thread = None
+        self.started = 0.0  # epoch time the polling thread last started
+        self.last_ok = 0.0  # epoch time of the last successful fetch
+
+    def _interval(self):
+        """Fastest interval any live reader asked for, None once every reader is gone (caller holds lock)"""
+        now = time.monotonic()
+        for token, (_, seen, _) in list(self.readers.items()):
+            if now - seen >= POLLER_IDLE_TIMEOUT:
+                del self.readers[token]  # tab closed without pausing
+        return min((interval for interval, _, _ in self.readers.values()), default=None)
+
+    def _run(self):
+        session = make_http_session()
+        last, quiet = None, 0
+        while True:
+            with self.lock:
+                interval = self._interval()
+                if interval is None:
+                    self.thread = None
+                    break
+            data = read_esp32_data(session, self.url)
+            if data is not None:
+                with self.lock:
+                    self.last_ok = time.time()
+                    self.samples.append((self.last_ok, data))
+                    self.seq += 1
+                    self.fresh.notify_all()
+            # Steady readings: back off, any change (or failed fetch) returns to the requested rate
+            quiet = quiet + 1 if data is not None and data == last else 0
+            last = data
+            backoff = interval * (1 << min(quiet, POLL_BACKOFF_STEPS))
+            self.wake.wait(min(backoff, max(interval, POLL_BACKOFF_MAX)))
+            self.wake.clear()
+        session.close()
+
+    def drain(self, token, interval: float, since):
+        """Samples newer than sequence number `since` (None: just the newest) and the new cursor.
+
+        The poller runs at the fastest interval any reader asked for; each reader only gets
+        samples at least its own interval apart, so other viewers' settings never change
+        how much time its history covers.
+        """
+        with self.lock:
+            previous, _, handed = self.readers.get(token, (None, None, 0.0))
+            if self.thread is None:
+                self.started = time.time()
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+            elif previous != interval:
+                self.wake.set()  # new reader or new interval, don't sit out the old wait
+            available = len(self.samples)
+            n = min(1 if since is None else self.seq - since, available)
+            samples = []
+            for ts, data in itertools.islice(self.samples, available - n, None):
+                if ts - handed >= interval * 0.9:  # 10% slack for poll scheduling jitter
+                    samples.append((ts, data))
+                    handed = ts
+            self.readers[token] = (interval, time.monotonic(), handed)
+            return samples, self.seq
+
+    def wait(self, since, timeout: float) -> bool:
+        """Block until a sample newer than sequence number `since` arrives, False on timeout"""
+        with self.fresh:
+            return self.fresh.wait_for(lambda: self.seq != since, timeout)
+
+    def stale(self, limit: float) -> bool:
+        """True once the polling thread has gone `limit` seconds without a successful fetch"""
+        with self.lock:
+            return self.thread is not None and time.time() - max(self.last_ok, self.started) > limit
+
+    def release(self, token):
+        """Stop polling on behalf of a paused session"""
+        with self.lock:
+            self.readers.pop(token, None)
+
+@st.cache_resource(show_spinner=False)
+def get_esp32_poller() -> ESP32Poller:
+    """Process-wide poller, so the ESP32 is read once per interval however many viewers there are"""
+    return ESP32Poller(DATA_URL)
 
 # -------------------------------
 # SIDEBAR
@@ -840,10 +1258,8 @@ with st.sidebar:
     st.markdown("### 🔄 Auto-Refresh")
     st.session_state.refresh_sec = st.selectbox(
         "Refresh Interval",
-        [0.5, 1, 2, 5, 10],
-        index=[0.5, 1, 2, 5, 10].index(st.session_state.refresh_sec)
-        if st.session_state.refresh_sec in [0.5, 1, 2, 5, 10]
-        else 1,
+        REFRESH_OPTIONS,
+        index=REFRESH_INDEX.get(st.session_state.refresh_sec, 1),
     )
 
     st.session_state.auto_refresh = st.checkbox(
@@ -866,40 +1282,38 @@ with st.sidebar:
 
     st.markdown("---")
 
-    st.markdown("### 📊 Live Statistics")
-    if len(st.session_state.history) > 0:
-        st.metric("📈 Data Points", len(st.session_state.history))
-
-        avg_ptu300 = st.session_state.history['PTU300'].astype(float).mean()
-        st.metric("💧 Avg PTU-300", f"{avg_ptu300:.2f} NTU")
-
-        avg_ptu8011 = st.session_state.history['PTU8011'].astype(float).mean()
-        st.metric("💧 Avg PTU-8011", f"{avg_ptu8011:.2f} NTU")
-
-        avg_temp = st.session_state.history['Temperature'].astype(float).mean()
-        st.metric("🌡️ Avg Temperature", f"{avg_temp:.2f} °C")
-
-        avg_pressure = st.session_state.history['Pressure'].astype(float).mean()
-        st.metric("⚙️ Avg Pressure", f"{avg_pressure:.2f} Bar")
-
-        if 'Flow' in st.session_state.history.columns:
-            avg_flow = st.session_state.history['Flow'].astype(float).mean()
-            st.metric("💨 Avg Flow", f"{avg_flow:.2f} L/min")
-        if 'pH' in st.session_state.history.columns:
-            avg_ph = st.session_state.history['pH'].astype(float).mean()
-            st.metric("⚗️ Avg pH", f"{avg_ph:.2f}")
+# -------------------------------
+# SIDEBAR - LIVE STATISTICS
+# -------------------------------
+@st.fragment(run_every=live_refresh_interval())
+def live_statistics():
+    """Sidebar statistics, refreshed on the same cadence as the dashboard"""
+    count = st.session_state.count
+    if count > 0:
+        hist = st.session_state.buf[:, :count]
+        means = hist.mean(axis=1, dtype=np.float64)
+        maxes = hist.max(axis=1)
+        st.metric("📈 Data Points", count)
+
+        st.metric("💧 Avg PTU-300", f"{means[HISTORY_INDEX['PTU300']]:.2f} NTU")
+        st.metric("💧 Avg PTU-8011", f"{means[HISTORY_INDEX['PTU8011']]:.2f} NTU")
+        st.metric("🌡️ Avg Temperature", f"{means[HISTORY_INDEX['Temperature']]:.2f} °C")
+        st.metric("⚙️ Avg Pressure", f"{means[HISTORY_INDEX['Pressure']]:.2f} Bar")
+        st.metric("💨 Avg Flow", f"{means[HISTORY_INDEX['Flow']]:.2f} L/min")
+        st.metric("⚗️ Avg pH", f"{means[HISTORY_INDEX['pH']]:.2f}")
 
         st.markdown("---")
 
-        max_ptu300 = st.session_state.history['PTU300'].astype(float).max()
-        st.metric("🔺 Max PTU-300", f"{max_ptu300:.2f} NTU")
-
-        max_temp = st.session_state.history['Temperature'].astype(float).max()
-        st.metric("🔥 Max Temperature", f"{max_temp:.2f} °C")
+        st.metric("🔺 Max PTU-300", f"{maxes[HISTORY_INDEX['PTU300']]:.2f} NTU")
+        st.metric("🔥 Max Temperature", f"{maxes[HISTORY_INDEX['Temperature']]:.2f} °C")
 
     else:
         st.info("📊 No data available yet...")
 
+with st.sidebar:
+    st.markdown("### 📊 Live Statistics")
+    live_statistics()
+
     st.markdown("---")
 
     st.markdown("### 📖 Turbidity Guide")
@@ -913,7 +1327,7 @@ with st.sidebar:
 # -------------------------------
 # TOP NAVIGATION BAR
 # -------------------------------
-st.markdown(f"""
+TOP_NAV_HTML = """
 <div class="top-nav">
     <div class="nav-brand">
         <div class="nav-logo">🌊</div>
@@ -927,367 +1341,189 @@ st.markdown(f"""
         LIVE
     </div>
 </div>
-""", unsafe_allow_html=True)
+"""
+
+st.markdown(TOP_NAV_HTML, unsafe_allow_html=True)
 
 # -------------------------------
-# MAIN CONTENT - AUTO REFRESH LOOP
+# MAIN CONTENT - LIVE FRAGMENT
 # -------------------------------
-placeholder = st.empty()
-
-while True:
-    with placeholder.container():
-        # Fetch data
-        data = read_esp32_data(DATA_URL)
-        ptu300 = data.get("ptu300", 0.0)
-        ptu8011 = data.get("ptu8011", 0.0)
-        flow_rate = data.get("flow", 0.0)
-        ph_value = data.get("ph", 7.0)
-        temperature = data.get("temperature", 25.0)
-        pressure = data.get("pressure", 1.0)
-
-        # Get status for turbidity sensors
-        ptu300_status = get_turbidity_status(ptu300)
-        ptu8011_status = get_turbidity_status(ptu8011)
-
-        # Update history
-        new_row = pd.DataFrame({
-            "time": [datetime.now().strftime("%H:%M:%S")],
-            "PTU300": [ptu300],
-            "PTU8011": [ptu8011],
-            "Temperature": [temperature],
-            "Pressure": [pressure],
-            "Flow": [flow_rate],
-            "pH": [ph_value]
-        })
-        st.session_state.history = pd.concat(
-            [st.session_state.history, new_row],
-            ignore_index=True
-        )
-
-        # Keep only last 100 records
-        if len(st.session_state.history) > 100:
-            st.session_state.history = st.session_state.history.iloc[-100:]
-
-        # Calculate tank level based on turbidity difference
-        try:
-            tank_level = 50 + (float(ptu300) - float(ptu8011)) * 5
-        except Exception:
-            tank_level = 50
-        tank_level = max(10, min(90, tank_level))
-
-        # -------------------------------
-        # ROW 1: MAIN SCADA WIDGETS
-        # -------------------------------
-        col1, col2, col3, col4 = st.columns([1, 1, 1, 1], gap="small")
-
-        with col1:
-            st.markdown(f"""
-            <div class="scada-card">
-                <div class="card-title">
-                    <span class="card-icon">💧</span>
-                    Input Tank
-                </div>
-                <div class="tank-container">
-                    <div class="tank">
-                        <div class="liquid" style="height:{tank_level}%"></div>
-                    </div>
-                    <div class="tank-label">{tank_level:.1f}%</div>
-                    <div class="value-display">Water Level</div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        with col2:
-            ptu300_percent = min(ptu300 * 10, 100)
-            st.markdown(f"""
-            <div class="scada-card">
-                <div class="card-title">
-                    <span class="card-icon">🧪</span>
-                    PTU-300
-                </div>
-                <div class="gauge-container">
-                    <div>
-                        <div class="mini-gauge" style="--value:{ptu300_percent}; --color:{ptu300_status['color']};">
-                            <div class="mini-gauge-value">{ptu300:.2f}</div>
-                        </div>
-                        <div class="gauge-label" style="margin-top:0.4rem;">NTU</div>
-                        <div class="status-badge {ptu300_status['class']}">
-                            {ptu300_status['icon']} {ptu300_status['status']}
-                        </div>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        with col3:
-            ptu8011_percent = min(ptu8011 * 10, 100)
-            st.markdown(f"""
-            <div class="scada-card">
-                <div class="card-title">
-                    <span class="card-icon">🧪</span>
-                    PTU-8011
-                </div>
-                <div class="gauge-container">
-                    <div>
-                        <div class="mini-gauge" style="--value:{ptu8011_percent}; --color:{ptu8011_status['color']};">
-                            <div class="mini-gauge-value">{ptu8011:.2f}</div>
-                        </div>
-                        <div class="gauge-label" style="margin-top:0.4rem;">NTU</div>
-                        <div class="status-badge {ptu8011_status['class']}">
-                            {ptu8011_status['icon']} {ptu8011_status['status']}
-                        </div>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        with col4:
-            try:
-                flow_percent = min((float(flow_rate) / 20.0) * 100.0, 100.0)
-            except Exception:
-                flow_rate = 0.0
-                flow_percent = 0.0
-
-            try:
-                fval = float(flow_rate)
-            except Exception:
-                fval = 0.0
-            if fval <= 0:
-                flow_status = {"status": "No Flow", "class": "status-danger", "icon": "⛔", "color": "#ef4444"}
-            elif fval < 1:
-                flow_status = {"status": "Low", "class": "status-turbid", "icon": "⚠️", "color": "#f59e0b"}
-            elif fval <= 15:
-                flow_status = {"status": "Normal", "class": "status-clear", "icon": "✅", "color": "#10b981"}
-            else:
-                flow_status = {"status": "High", "class": "status-turbid", "icon": "⚡", "color": "#f59e0b"}
-
-            st.markdown(f"""
-            <div class="scada-card">
-                <div class="card-title">
-                    <span class="card-icon">💨</span>
-                    Flow Meter
-                </div>
-                <div class="gauge-container">
-                    <div class="mini-gauge" style="--value:{flow_percent}; --color:{flow_status['color']};">
-                        <div class="mini-gauge-value">{flow_rate:.2f}</div>
-                    </div>
-                    <div class="gauge-label" style="margin-top:0.4rem;">L/min</div>
-                    <div class="progress-container" style="margin-top:0.5rem;">
-                        <div class="progress-fill" style="width:{flow_percent}%;"></div>
-                    </div>
-                    <div class="status-badge {flow_status['class']}" style="margin-top:0.5rem;">
-                        {flow_status['icon']} {flow_status['status']}
-                    </div>
-                    <div class="value-display" style="margin-top:0.3rem;">
-                        {flow_percent:.1f}%
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        # -------------------------------
-        # ROW 2: Temperature & Pressure & pH
-        # -------------------------------
-        col_t, col_p, col_ph = st.columns([1, 1, 1], gap="small")
-
-        with col_t:
-            try:
-                temp_percent = min((float(temperature) / 50.0) * 100.0, 100.0)
-            except Exception:
-                temperature = 0.0
-                temp_percent = 0.0
-            temp_color = "#3b82f6" if 20 <= float(temperature) <= 30 else "#f59e0b" if 15 <= float(temperature) <= 35 else "#ef4444"
-            temp_status = "Normal" if 20 <= float(temperature) <= 30 else "Warning" if 15 <= float(temperature) <= 35 else "Danger"
-            temp_class = "status-clear" if temp_status == "Normal" else "status-turbid" if temp_status == "Warning" else "status-danger"
-
-            st.markdown(f"""
-            <div class="scada-card">
-                <div class="card-title">
-                    <span class="card-icon">🌡️</span>
-                    Temperature
-                </div>
-                <div class="gauge-container">
-                    <div class="mini-gauge" style="--value:{temp_percent}; --color:{temp_color};">
-                        <div class="mini-gauge-value">{temperature:.1f}</div>
-                    </div>
-                    <div class="gauge-label" style="margin-top:0.4rem;">°C</div>
-                    <div class="status-badge {temp_class}">
-                        {temp_status}
-                    </div>
-                    <div class="value-display">20-30 °C</div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        with col_p:
-            try:
-                pressure_percent = min((float(pressure) / 5.0) * 100.0, 100.0)
-            except Exception:
-                pressure = 0.0
-                pressure_percent = 0.0
-            pressure_color = "#10b981" if 1.0 <= float(pressure) <= 2.0 else "#f59e0b" if 0.5 <= float(pressure) <= 3.0 else "#ef4444"
-            pressure_status = "Normal" if 1.0 <= float(pressure) <= 2.0 else "Warning" if 0.5 <= float(pressure) <= 3.0 else "Danger"
-            pressure_class = "status-clear" if pressure_status == "Normal" else "status-turbid" if pressure_status == "Warning" else "status-danger"
-
-            st.markdown(f"""
-            <div class="scada-card">
-                <div class="card-title">
-                    <span class="card-icon">⚙️</span>
-                    Pressure
-                </div>
-                <div class="gauge-container">
-                    <div class="mini-gauge" style="--value:{pressure_percent}; --color:{pressure_color};">
-                        <div class="mini-gauge-value">{pressure:.2f}</div>
-                    </div>
-                    <div class="gauge-label" style="margin-top:0.4rem;">Bar</div>
-                    <div class="status-badge {pressure_class}">
-                        {pressure_status}
-                    </div>
-                    <div class="value-display">1.0-2.0 Bar</div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        with col_ph:
-            try:
-                ph_percent = min((float(ph_value) / 14.0) * 100.0, 100.0)
-            except Exception:
-                ph_value = 0.0
-                ph_percent = 0.0
-            ph_color = "#10b981" if 6.5 <= float(ph_value) <= 8.5 else "#f59e0b" if 5 <= float(ph_value) <= 9 else "#ef4444"
-            ph_status = "Normal" if 6.5 <= float(ph_value) <= 8.5 else "Warning" if 5 <= float(ph_value) <= 9 else "Danger"
-            ph_class = "status-clear" if ph_status == "Normal" else "status-turbid" if ph_status == "Warning" else "status-danger"
-
-            st.markdown(f"""
-            <div class="scada-card">
-                <div class="card-title">
-                    <span class="card-icon">🧫</span>
-                    pH Sensor
-                </div>
-                <div class="gauge-container">
-                    <div class="mini-gauge" style="--value:{ph_percent}; --color:{ph_color};">
-                        <div class="mini-gauge-value">{ph_value:.2f}</div>
-                    </div>
-                    <div class="gauge-label" style="margin-top:0.4rem;">pH</div>
-                    <div class="status-badge {ph_class}">
-                        {ph_status}
-                    </div>
-                    <div class="value-display">6.5-8.5</div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        # -------------------------------
-        # ROW 3: TREND CHART WITH PLOTLY
-        # -------------------------------
-        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-        st.markdown('<div class="chart-title">📈 Trend Analysis</div>', unsafe_allow_html=True)
-
-        if len(st.session_state.history) > 0:
-            # Create Plotly chart with theme
-            fig = go.Figure()
-
-            # Add traces for each parameter
-            fig.add_trace(go.Scatter(
-                x=st.session_state.history['time'],
-                y=st.session_state.history['PTU300'],
-                mode='lines+markers',
-                name='PTU-300',
-                line=dict(color='#3b82f6', width=2),
-                marker=dict(size=3)
-            ))
-
-            fig.add_trace(go.Scatter(
-                x=st.session_state.history['time'],
-                y=st.session_state.history['PTU8011'],
-                mode='lines+markers',
-                name='PTU-8011',
-                line=dict(color='#10b981', width=2),
-                marker=dict(size=3)
-            ))
-
-            fig.add_trace(go.Scatter(
-                x=st.session_state.history['time'],
-                y=st.session_state.history['Temperature'],
-                mode='lines+markers',
-                name='Temp',
-                line=dict(color='#f59e0b', width=2),
-                marker=dict(size=3)
-            ))
-
-            fig.add_trace(go.Scatter(
-                x=st.session_state.history['time'],
-                y=st.session_state.history['Flow'],
-                mode='lines+markers',
-                name='Flow',
-                line=dict(color='#8b5cf6', width=2),
-                marker=dict(size=3)
-            ))
-
-            fig.add_trace(go.Scatter(
-                x=st.session_state.history['time'],
-                y=st.session_state.history['pH'],
-                mode='lines+markers',
-                name='pH',
-                line=dict(color='#ec4899', width=2),
-                marker=dict(size=3)
-            ))
-
-            # Update layout based on theme
-            fig.update_layout(
-                height=300,
-                plot_bgcolor=colors['chart_bg'],
-                paper_bgcolor=colors['chart_bg'],
-                font=dict(
-                    color=colors['chart_text'],
-                    size=10
-                ),
-                xaxis=dict(
-                    showgrid=True,
-                    gridcolor=colors['chart_grid'],
-                    gridwidth=1,
-                    zeroline=False,
-                    color=colors['chart_text']
-                ),
-                yaxis=dict(
-                    showgrid=True,
-                    gridcolor=colors['chart_grid'],
-                    gridwidth=1,
-                    zeroline=False,
-                    color=colors['chart_text']
-                ),
-                legend=dict(
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="center",
-                    x=0.5,
-                    bgcolor='rgba(0,0,0,0)',
-                    font=dict(color=colors['chart_text'], size=9)
-                ),
-                margin=dict(l=35, r=15, t=35, b=35),
-                hovermode='x unified'
-            )
-
-            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+def collect_samples():
+    """Pull new samples from the shared poller into the history, or sign off while paused"""
+    poller = get_esp32_poller()
+    first_run = "last_data" not in st.session_state and "first_fetch_done" not in st.session_state
+    if first_run:
+        st.session_state.first_fetch_done = True
+    if st.session_state.auto_refresh:
+        # Collect samples gathered by the background poller since the last run
+        token, interval = st.session_state.poll_token, st.session_state.refresh_sec
+        since = st.session_state.get("poll_seq")
+        samples, st.session_state.poll_seq = poller.drain(token, interval, since)
+        if since is None and samples and st.session_state.count > 0:
+            # Resumed: the newest sample may be the one already written before the pause
+            newest = st.session_state.times[(st.session_state.head - 1) % HISTORY_SIZE]
+            samples = [sample for sample in samples if sample[0] > newest]
+        if not samples and first_run and poller.wait(st.session_state.poll_seq, FIRST_SAMPLE_WAIT):
+            # The poller has only just started: take its first sample rather than
+            # send the ESP32 a second request of our own
+            samples, st.session_state.poll_seq = poller.drain(token, interval, st.session_state.poll_seq)
+        if samples:
+            append_history(samples)
+            st.session_state.last_data = samples[-1][1]
+    else:
+        # Paused: no polling on our behalf, keep rendering the last known reading
+        poller.release(st.session_state.poll_token)
+        st.session_state.pop("poll_seq", None)  # resume from the newest sample, not a backlog
+        if first_run:
+            # Paused from the start: nothing polls for us, so fetch one reading to show
+            now = time.time()
+            with make_http_session() as http:
+                reading = read_esp32_data(http, DATA_URL)
+            if reading is not None:
+                append_history([(now, reading)])
+                st.session_state.last_data = reading
+
+def build_card_rows(data):
+    """HTML for both card rows from one reading tuple"""
+    reading = np.array(data)
+    ptu300, ptu8011, temperature, pressure, flow_rate, ph_value = reading.tolist()
+
+    # Gauge fill levels for every sensor in one vectorized step
+    (ptu300_percent, ptu8011_percent, temp_percent,
+     pressure_percent, flow_percent, ph_percent) = np.minimum(reading * GAUGE_SCALES, 100.0).tolist()
+
+    # Get status for turbidity sensors
+    ptu300_status = get_turbidity_status(ptu300)
+    ptu8011_status = get_turbidity_status(ptu8011)
+
+    # Calculate tank level based on turbidity difference
+    tank_level = max(10, min(90, 50 + (ptu300 - ptu8011) * 5))
+
+    # -------------------------------
+    # ROW 1: MAIN SCADA WIDGETS
+    # -------------------------------
+    tank_card = TANK_CARD.format_map({"level": tank_level})
+
+    ptu300_view = {
+        "title": "PTU-300", "percent": ptu300_percent, "color": ptu300_status["color"], "value": ptu300,
+        "css_class": ptu300_status["class"], "icon": ptu300_status["icon"], "status": ptu300_status["status"],
+    }
+    ptu300_card = TURBIDITY_CARD.format_map(ptu300_view)
+
+    ptu8011_view = {
+        "title": "PTU-8011", "percent": ptu8011_percent, "color": ptu8011_status["color"], "value": ptu8011,
+        "css_class": ptu8011_status["class"], "icon": ptu8011_status["icon"], "status": ptu8011_status["status"],
+    }
+    ptu8011_card = TURBIDITY_CARD.format_map(ptu8011_view)
+
+    flow_status = get_flow_status(flow_rate)
+    flow_view = {
+        "percent": flow_percent, "color": flow_status["color"], "value": flow_rate,
+        "css_class": flow_status["class"], "icon": flow_status["icon"], "status": flow_status["status"],
+    }
+    flow_card = FLOW_CARD.format_map(flow_view)
+
+    # One markdown element for the whole row, laid out by the .scada-row grid
+    row1 = f'<div class="scada-row">{tank_card}{ptu300_card}{ptu8011_card}{flow_card}</div>'
+
+    # -------------------------------
+    # ROW 2: Temperature & Pressure & pH
+    # -------------------------------
+    temp_color, temp_status, temp_class = TEMP_BANDS[band(temperature, 20, 30, 15, 35)]
+    temp_view = {
+        "icon": "🌡️", "title": "Temperature", "percent": temp_percent, "color": temp_color,
+        "value": temperature, "digits": 1, "unit": "°C", "css_class": temp_class,
+        "status": temp_status, "normal_range": "20-30 °C",
+    }
+    temp_card = SENSOR_CARD.format_map(temp_view)
+
+    pressure_color, pressure_status, pressure_class = SENSOR_BANDS[band(pressure, 1.0, 2.0, 0.5, 3.0)]
+    pressure_view = {
+        "icon": "⚙️", "title": "Pressure", "percent": pressure_percent, "color": pressure_color,
+        "value": pressure, "digits": 2, "unit": "Bar", "css_class": pressure_class,
+        "status": pressure_status, "normal_range": "1.0-2.0 Bar",
+    }
+    pressure_card = SENSOR_CARD.format_map(pressure_view)
+
+    ph_color, ph_status, ph_class = SENSOR_BANDS[band(ph_value, 6.5, 8.5, 5, 9)]
+    ph_view = {
+        "icon": "🧫", "title": "pH Sensor", "percent": ph_percent, "color": ph_color,
+        "value": ph_value, "digits": 2, "unit": "pH", "css_class": ph_class,
+        "status": ph_status, "normal_range": "6.5-8.5",
+    }
+    ph_card = SENSOR_CARD.format_map(ph_view)
+
+    row2 = f'<div class="scada-row scada-row-3">{temp_card}{pressure_card}{ph_card}</div>'
+    return row1, row2
+
+@st.fragment(run_every=live_refresh_interval())
+def live_dashboard():
+    """Cards, trend chart and refresh info; reruns on its own, the rest of the page does not"""
+    collect_samples()
+    data = st.session_state.get("last_data")
+    stale_after = max(st.session_state.refresh_sec, POLL_BACKOFF_MAX) + POLL_STALE_SLACK
+    if st.session_state.auto_refresh and get_esp32_poller().stale(stale_after):
+        # A dead link must not pass for steady readings, so drop the cards until the ESP32 answers
+        if st.session_state.count > 0:
+            newest = st.session_state.times[(st.session_state.head - 1) % HISTORY_SIZE]
+            st.error(f"📡 ESP32 unreachable, last reading {time.strftime('%H:%M:%S', time.localtime(newest))}")
         else:
-            st.info("📊 Waiting for data...")
-
-        st.markdown('</div>', unsafe_allow_html=True)
-
-        # Refresh info
-        st.markdown(f"""
-        <div class="refresh-info">
-            🔄 Auto-refresh: {'✅ On' if st.session_state.auto_refresh else '❌ Off'} 
-            | ⏱️ {st.session_state.refresh_sec}s 
-            | 🕐 {datetime.now().strftime("%H:%M:%S")}
-        </div>
-        """, unsafe_allow_html=True)
+            st.error("📡 ESP32 unreachable, no reading yet")
+    elif data is None:
+        # Never dress placeholder values up as a live reading
+        st.info("📡 Waiting for the first ESP32 reading...")
+    else:
+        # Same reading as the previous tick: re-emit the rows without rebuilding them
+        if st.session_state.get("card_rows_for") != data:
+            st.session_state.card_rows = build_card_rows(data)
+            st.session_state.card_rows_for = data
+        row1, row2 = st.session_state.card_rows
+        st.markdown(row1, unsafe_allow_html=True)
+        st.markdown(row2, unsafe_allow_html=True)
+
+    # -------------------------------
+    # ROW 3: TREND CHART WITH PLOTLY
+    # -------------------------------
+    # Markdown elements cannot wrap the chart, so the card header is one element of its own
+    st.markdown(
+        '<div class="chart-container"><div class="chart-title">📈 Trend Analysis</div></div>',
+        unsafe_allow_html=True
+    )
 
-    # Delay based on refresh interval
-    if st.session_state.auto_refresh:
-        time.sleep(st.session_state.refresh_sec)
+    if st.session_state.count > 0:
+        # Reuse the session figure, only the trace data changes between ticks
+        if "trend_fig" not in st.session_state:
+            st.session_state.trend_fig = build_trend_figure()
+            st.session_state.trend_fig_dark = None
+            st.session_state.trend_latest = None
+        fig = st.session_state.trend_fig
+        if st.session_state.trend_fig_dark != st.session_state.dark_mode:
+            apply_trend_theme(fig, colors)
+            st.session_state.trend_fig_dark = st.session_state.dark_mode
+
+        # Timestamp of the newest sample tells whether the traces are already current
+        latest = st.session_state.times[(st.session_state.head - 1) % HISTORY_SIZE]
+        if st.session_state.trend_latest != latest:
+            times = to_local_epoch_ms(history_window(st.session_state.times))
+            series = history_window(st.session_state.buf)
+            for trace, (column, _, _) in zip(fig.data, TREND_TRACES):
+                y = series[HISTORY_INDEX[column]]
+                if len(y) > CHART_MAX_POINTS:
+                    keep = lttb_indices(times, y, CHART_MAX_POINTS)
+                    trace.x, trace.y = times[keep], y[keep]
+                else:
+                    trace.x, trace.y = times, y
+            st.session_state.trend_latest = latest
+
+        st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False}, key="trend")
     else:
-        break
+        st.info("📊 Waiting for data...")
 
-    
+    # Refresh info
+    st.markdown(REFRESH_INFO.format(
+        state='✅ On' if st.session_state.auto_refresh else '❌ Off',
+        interval=st.session_state.refresh_sec,
+        clock=time.strftime("%H:%M:%S")
+    ), unsafe_allow_html=True)
+
+live_dashboard()